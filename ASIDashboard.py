@@ -6,8 +6,14 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from PIL import Image
-import requests
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from pathlib import Path
+from asi_catalog import build_catalog_manifest
+from asi_ingest import default_sources, ingest_sources, prepare_dataset, source_name
+from asi_ranges import is_full_year_range, year_range_totals, year_range_values, year_range_years
 
 # Set page configuration
 st.set_page_config(
@@ -107,32 +113,70 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Function to load data
-@st.cache_data
-def load_data_from_github():
-    try:
-        # Your GitHub raw URL
-        url = "https://github.com/waliapriyanshu/Annual-Survey-of-Industries-ASI/raw/0855da82d8f9bc0b6e24dcb2195c605db4a19fd2/ASI%20data.xlsx"
-
-        # Download the Excel file content
-        response = requests.get(url)
-        response.raise_for_status()
-        file_bytes = BytesIO(response.content)
-
-        # Load the three sheets
-        df_all_india = pd.read_excel(file_bytes, sheet_name='Sheet1')
-        df_kerala = pd.read_excel(file_bytes, sheet_name='Sheet2')
-        df_haryana = pd.read_excel(file_bytes, sheet_name='Sheet3')
+# Function to start ingesting the sources in the background, once per server process
+@st.cache_resource
+def start_ingest(sources):
+    progress = {}
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(asyncio.run, ingest_sources(sources, progress))
+    executor.shutdown(wait=False)
+    return future, progress
 
-        # Combine and return
-        combined_df = pd.concat([df_all_india, df_kerala, df_haryana], ignore_index=True)
-        time_df = combined_df.copy()
-        return combined_df, time_df
+# Progress panel that refreshes on its own while the sources arrive
+@st.fragment(run_every=1)
+def show_ingest_progress(future, progress):
+    if future.done():
+        st.rerun()
+    
+    st.info("Loading data sources...")
+    for location, state in list(progress.items()):
+        received_mb = state['received'] / 1e6
+        if state['stage'] == 'Failed':
+            st.warning(f"{source_name(location)}: {state['error']}")
+        elif state['total']:
+            text = f"{source_name(location)}: {state['stage']} ({received_mb:.1f} of {state['total'] / 1e6:.1f} MB)"
+            st.progress(min(state['received'] / state['total'], 1.0), text=text)
+        else:
+            st.progress(1.0 if state['stage'] == 'Done' else 0.0, text=f"{source_name(location)}: {state['stage']} ({received_mb:.1f} MB)")
 
+# Function to load data from the default sources, rendering progress until they arrive
+def load_data_from_github():
+    future, progress = start_ingest(default_sources())
+    if not future.done():
+        show_ingest_progress(future, progress)
+        st.stop()
+    
+    try:
+        combined_df, prepared = future.result()
     except Exception as e:
-        st.error(f"Error loading data from GitHub: {e}")
-        return pd.DataFrame(), pd.DataFrame()
+        # Drop the failed job so the next rerun tries again
+        start_ingest.clear()
+        st.error(f"Error loading data: {e}")
+        return pd.DataFrame(), None
+    
+    # Optional sources are best-effort, so report any that failed and carry on
+    for location, state in progress.items():
+        if state['stage'] == 'Failed':
+            st.warning(f"Could not load {source_name(location)}: {state['error']}")
+    
+    # The ingested frame is shared across sessions and only read from here on
+    return combined_df, prepared
+
 
+# Function to read and prepare every sheet of an uploaded workbook, cached on the
+# file contents so the workbook is parsed and checked once per upload rather than every rerun
+@st.cache_data(max_entries=1)
+def load_uploaded_workbook(content):
+    sheet_dfs = []
+    for sheet, df in pd.read_excel(BytesIO(content), sheet_name=None).items():
+        # Add sheet name as source if not already in columns
+        if 'Source' not in df.columns:
+            df['Source'] = sheet
+        sheet_dfs.append(df)
+    
+    # Combine all dataframes, check them and precompute the year-range arrays
+    combined_df = pd.concat(sheet_dfs, ignore_index=True)
+    return combined_df, prepare_dataset(combined_df)
 
 # Function to upload Excel file
 def upload_excel_file():
@@ -140,46 +184,383 @@ def upload_excel_file():
     
     if uploaded_file is not None:
         try:
-            # Read all sheets
-            sheet_names = pd.ExcelFile(uploaded_file).sheet_names
-            sheet_dfs = []
-            
-            for sheet in sheet_names:
-                df = pd.read_excel(uploaded_file, sheet_name=sheet)
-                # Add sheet name as source if not already in columns
-                if 'Source' not in df.columns:
-                    df['Source'] = sheet
-                sheet_dfs.append(df)
-            
-            # Combine all dataframes
-            combined_df = pd.concat(sheet_dfs, ignore_index=True)
-            
-            # Create a time series dataframe
-            time_df = combined_df.copy()
-            
-            return combined_df, time_df
+            combined_df, prepared = load_uploaded_workbook(uploaded_file.getvalue())
+            return combined_df, None, prepared
         except Exception as e:
             st.error(f"Error processing uploaded file: {e}")
-            return pd.DataFrame(), pd.DataFrame()
+            return pd.DataFrame(), None, None
+    elif CATALOG_DIR:
+        # If no file is uploaded, load the needed partitions of the dataset catalog
+        return load_catalog_view(CATALOG_DIR)
     else:
         # If no file is uploaded, load sample data
-        return load_data_from_github()
+        combined_df, prepared = load_data_from_github()
+        return combined_df, None, prepared
+
+# Directory of per-year or per-state workbooks to use instead of the sample data
+CATALOG_DIR = os.environ.get("ASI_DATA_DIR", "")
+
+# Function to index the catalog directory, refreshed every minute so new or
+# changed files are picked up without rescanning the tree on every rerun
+@st.cache_data(ttl=60)
+def load_catalog_manifest(data_dir):
+    return build_catalog_manifest(data_dir)
+
+# Function to load one catalog partition, kept in cache until the file changes
+@st.cache_data(max_entries=64)
+def load_partition(path, modified, year, state):
+    sheet_dfs = []
+    for sheet, df in pd.read_excel(path, sheet_name=None).items():
+        # Add file and sheet name as source and partition keys if not already in columns
+        if 'Source' not in df.columns:
+            df['Source'] = f"{Path(path).name} / {sheet}"
+        if 'Year' not in df.columns and year is not None:
+            df['Year'] = year
+        if 'State' not in df.columns and state is not None:
+            df['State'] = state
+        sheet_dfs.append(df)
+    return pd.concat(sheet_dfs, ignore_index=True)
+
+# Function to combine and prepare a set of catalog partitions, cached by their paths
+# and modification times so the check runs once per selection rather than every rerun.
+# Only the current selection is kept, since the partitions themselves are cached above
+@st.cache_data(max_entries=1)
+def load_catalog_partitions(partitions):
+    combined_df = pd.concat([load_partition(*partition) for partition in partitions], ignore_index=True)
+    return combined_df, prepare_dataset(combined_df)
+
+# Function to load only the catalog partitions needed for the sidebar selection
+def load_catalog_view(data_dir):
+    try:
+        manifest = load_catalog_manifest(data_dir)
+        if manifest.empty:
+            st.error(f"No Excel files found in the data directory: {data_dir}")
+            return pd.DataFrame(), None, None
+        
+        # Year and state selectors come from the manifest, so nothing is read before filtering
+        year_range = None
+        catalog_years = sorted(manifest['Year'].dropna().astype(int).unique().tolist())
+        if len(catalog_years) > 1:
+            year_range = year_range_slider(catalog_years)
+        
+        selected_states = []
+        catalog_states = sorted(manifest['State'].dropna().unique().tolist())
+        if catalog_states:
+            selected_states = st.sidebar.multiselect(
+                "States to load",
+                options=catalog_states,
+                default=catalog_states
+            )
+            if not selected_states:
+                st.warning("Please select at least one state under 'States to load' in the sidebar.")
+                return pd.DataFrame(), year_range, None
+        
+        # Partitions without a year or state key hold every year or state, so point them out
+        unkeyed = manifest[
+            (manifest['Year'].isna() & bool(catalog_years)) |
+            (manifest['State'].isna() & bool(catalog_states))
+        ]
+        if not unkeyed.empty:
+            names = ', '.join(Path(path).relative_to(data_dir).as_posix() for path in unkeyed['Path'].head(5))
+            more = f" and {len(unkeyed) - 5} more" if len(unkeyed) > 5 else ""
+            st.sidebar.warning(f"No year or state found in the path of {names}{more}. These files are loaded for every selection.")
+        
+        needed = manifest
+        if year_range is not None:
+            needed = needed[needed['Year'].isna() | needed['Year'].between(*year_range)]
+        if selected_states:
+            needed = needed[needed['State'].isna() | needed['State'].isin(selected_states)]
+        st.sidebar.caption(f"Loaded {len(needed)} of {len(manifest)} catalog partitions")
+        
+        if needed.empty:
+            return pd.DataFrame(), year_range, None
+        
+        partitions = tuple(
+            (
+                row.Path,
+                row.Modified,
+                None if pd.isna(row.Year) else int(row.Year),
+                None if pd.isna(row.State) else row.State
+            )
+            for row in needed.itertuples()
+        )
+        combined_df, prepared = load_catalog_partitions(partitions)
+        return combined_df, year_range, prepared
+    
+    except Exception as e:
+        st.error(f"Error loading data catalog: {e}")
+        return pd.DataFrame(), None, None
+
+# Function to draw the sidebar year-range slider
+def year_range_slider(years):
+    return st.sidebar.slider(
+        "Year range",
+        min_value=int(years[0]),
+        max_value=int(years[-1]),
+        value=(int(years[0]), int(years[-1]))
+    )
+
+# Main sector chart, rerun on its own so changing the chart type only redraws this chart
+@st.fragment
+def sector_chart_panel(plot_df, num_sectors):
+    chart_type = st.selectbox(
+        "Select chart type", 
+        ["Bar Chart", "Pie Chart", "Treemap"]
+    )
+    
+    if chart_type == "Bar Chart":
+        st.markdown(f"<h3 style='color: #1e3a8a;'>Top {num_sectors} Manufacturing Sectors by Number of Factories</h3>", unsafe_allow_html=True)
+        fig = px.bar(
+            plot_df,
+            x='Sector',
+            y='Factories',
+            color='Factories',
+            color_continuous_scale='viridis',
+            text_auto='.2s',
+            height=600
+        )
+        fig.update_layout(
+            xaxis_title="Manufacturing Sector",
+            yaxis_title="Number of Factories",
+            font=dict(size=12),
+            xaxis={'categoryorder':'total descending'},
+            plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=30, b=100, l=80, r=40)
+        )
+        fig.update_xaxes(tickangle=45)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    elif chart_type == "Pie Chart":
+        st.markdown(f"<h3 style='color: #1e3a8a;'>Distribution of Top {num_sectors} Manufacturing Sectors</h3>", unsafe_allow_html=True)
+        fig = px.pie(
+            plot_df,
+            values='Factories',
+            names='Sector',
+            color_discrete_sequence=px.colors.sequential.Viridis,
+            height=600
+        )
+        fig.update_traces(
+            textposition='inside',
+            textinfo='percent+label',
+            hole=0.4,
+            pull=[0.05 if i == 0 else 0 for i in range(len(plot_df))]
+        )
+        fig.update_layout(
+            font=dict(size=12),
+            legend_title_text='Sectors',
+            plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=30, b=50, l=40, r=40)
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    elif chart_type == "Treemap":
+        st.markdown(f"<h3 style='color: #1e3a8a;'>Treemap of Top {num_sectors} Manufacturing Sectors</h3>", unsafe_allow_html=True)
+        fig = px.treemap(
+            plot_df,
+            path=['Sector'],
+            values='Factories',
+            color='Factories',
+            color_continuous_scale='viridis',
+            height=600
+        )
+        fig.update_layout(
+            font=dict(size=14),
+            plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=30, b=30, l=30, r=30)
+        )
+        # Fix the textinfo parameter - use a valid value
+        fig.update_traces(textinfo="label+value")
+        st.plotly_chart(fig, use_container_width=True)
+    
+# Main trend chart, rerun on its own so changing the visualization only redraws this chart
+@st.fragment
+def trend_chart_panel(filtered_time_df, value_col, chart_title):
+    trend_type = st.selectbox(
+        "Trend visualization",
+        options=["Line chart", "Area chart", "Bar chart"]
+    )
+    
+    if trend_type == "Line chart":
+        fig = px.line(
+            filtered_time_df,
+            x='Year',
+            y=value_col,
+            markers=True,
+            title=chart_title,
+            height=500
+        )
+        fig.update_traces(line=dict(width=3))
+    elif trend_type == "Area chart":
+        fig = px.area(
+            filtered_time_df,
+            x='Year',
+            y=value_col,
+            title=chart_title,
+            height=500
+        )
+    else:  # Bar chart
+        fig = px.bar(
+            filtered_time_df,
+            x='Year',
+            y=value_col,
+            title=chart_title,
+            height=500,
+            text_auto='.2s'
+        )
+    
+    fig.update_layout(
+        xaxis_title="Year",
+        yaxis_title="Number of Factories",
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=50, b=50, l=60, r=40)
+    )
+    fig.update_xaxes(dtick=1)  # Show all years
+    st.plotly_chart(fig, use_container_width=True)
+
+# Sector comparison panel, rerun on its own so the multiselect only redraws this chart
+@st.fragment
+def sector_comparison_panel(plot_df):
+    selected_sectors = st.multiselect(
+        "Select sectors to compare",
+        options=plot_df['Sector'].tolist(),
+        default=plot_df['Sector'].tolist()[:min(3, len(plot_df))]
+    )
+    
+    if selected_sectors:
+        comparison_df = plot_df[plot_df['Sector'].isin(selected_sectors)]
+        fig = px.bar(
+            comparison_df,
+            x='Sector',
+            y='Factories',
+            color='Sector',
+            height=300
+        )
+        fig.update_layout(
+            showlegend=False,
+            xaxis_title="",
+            yaxis_title="Factories",
+            plot_bgcolor='rgba(0,0,0,0)',
+            margin=dict(t=20, b=30, l=60, r=20)
+        )
+        st.plotly_chart(fig, use_container_width=True)
 
-# Load data from uploaded file or use sample data
-df, time_df = upload_excel_file()
+# State comparison panel, rerun on its own so the multiselect only redraws this chart
+@st.fragment
+def state_comparison_panel(state_totals, map_column):
+    selected_states = st.multiselect(
+        "Select states to compare",
+        options=state_totals['State'].tolist(),
+        default=state_totals.nlargest(min(3, len(state_totals)), map_column)['State'].tolist()
+    )
+    
+    if selected_states:
+        comparison_df = state_totals[state_totals['State'].isin(selected_states)]
+        fig = px.pie(
+            comparison_df,
+            values=map_column,
+            names='State',
+            height=300
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        st.plotly_chart(fig, use_container_width=True)
 
-# Dashboard header with improved styling
+# Function to render the data-quality report built at load time
+def show_validation_report(validation_report):
+    st.markdown("<h2 style='color: #1e3a8a; font-weight: 700;'>Data Quality Report</h2>", unsafe_allow_html=True)
+    
+    # Summary metrics from the report built at load time
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Rows Loaded", f"{validation_report['rows']:,}")
+    col2.metric("Coerced Values", f"{int(validation_report['coerced']['Coerced values'].sum()):,}")
+    col3.metric("Duplicate Key Rows", f"{validation_report['duplicate_rows']:,}")
+    col4.metric("Unmatched States", f"{len(validation_report['unmatched_states']):,}")
+    
+    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+    st.markdown("<h3 style='color: #1e3a8a;'>Values Turned Into Blanks</h3>", unsafe_allow_html=True)
+    if not validation_report['coerced'].empty:
+        st.caption("Non-numeric cells in numeric columns are treated as missing and left out of every total.")
+        st.dataframe(validation_report['coerced'], use_container_width=True, hide_index=True)
+    else:
+        st.success("Every Year and value cell is numeric.")
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+    st.markdown("<h3 style='color: #1e3a8a;'>Duplicate State, Sector and Year Keys</h3>", unsafe_allow_html=True)
+    if not validation_report['duplicates'].empty:
+        st.caption("Duplicate rows are all added together, so these totals may be counted more than once.")
+        st.dataframe(validation_report['duplicates'], use_container_width=True, hide_index=True)
+    else:
+        st.success("Each state, sector and year appears once.")
+    st.markdown("</div>", unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        st.markdown("<h3 style='color: #1e3a8a;'>Unmatched State Names</h3>", unsafe_allow_html=True)
+        if validation_report['unmatched_states']:
+            for state in validation_report['unmatched_states']:
+                st.markdown(f"- {state}")
+        else:
+            st.success("All state names match a known state or union territory.")
+        st.markdown("</div>", unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        st.markdown("<h3 style='color: #1e3a8a;'>Year Gaps</h3>", unsafe_allow_html=True)
+        if validation_report['missing_years']:
+            st.warning(f"Missing years: {', '.join(str(year) for year in validation_report['missing_years'])}")
+        else:
+            st.success("No years are missing from the overall range.")
+        st.metric("Series With Gaps", f"{validation_report['series_with_gaps']:,}")
+        st.markdown("</div>", unsafe_allow_html=True)
+
+# Dashboard header with improved styling, drawn before the data arrives
 st.title("🏭 Indian Manufacturing Sectors Dashboard")
 st.markdown("<p style='font-size: 1.2rem; color: #334155;'>An interactive exploration of manufacturing sectors across India</p>", unsafe_allow_html=True)
 
+# Load data from uploaded file or use sample data, with the report and
+# year-range arrays built once alongside it
+df, year_range, prepared = upload_excel_file()
+validation_report = prepared['report'] if prepared is not None else None
+value_col = prepared['value_col'] if prepared is not None else None
+year_prefix = prepared['year_prefix'] if prepared is not None else None
+
+# Sector and regional views need the NIC Description column
+if not df.empty and 'NIC Description' not in df.columns:
+    st.error("No 'NIC Description' column found in the data.")
+    df, value_col, year_prefix = pd.DataFrame(), None, None
+
+# The loaded frame is never modified, so the time series views read the same one
+time_df = df
+
+# Apply the year range to the precomputed per-series prefix sums for every tab
+if year_prefix is not None:
+    all_years = year_prefix['years']
+    # A catalog load has already drawn the slider from its manifest years
+    if year_range is None:
+        if len(all_years) > 1:
+            year_range = year_range_slider(all_years)
+        else:
+            year_range = (all_years[0], all_years[-1])
+    if year_prefix['undated_rows'] and not is_full_year_range(year_prefix, year_range):
+        st.sidebar.caption(f"{year_prefix['undated_rows']:,} rows without a valid Year are only counted when the full range is selected")
+    series_totals = year_range_totals(year_prefix, year_range)
+else:
+    series_totals = prepared['series_totals'] if value_col else None
+
 if df.empty:
-    st.warning("Please upload your Excel file using the uploader in the sidebar.")
+    if validation_report is not None:
+        # The data loaded but cannot be charted, so still show what the checks found
+        show_validation_report(validation_report)
+    else:
+        st.warning("Please upload your Excel file using the uploader in the sidebar.")
 else:
     # Create tabs for different views with improved styling
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "📊 **Sector Analysis**", 
         "🗺️ **Regional Distribution**", 
         "📈 **Time Series Analysis**", 
+        "🧪 **Data Quality**", 
         "ℹ️ **About**"
     ])
 
@@ -191,52 +572,35 @@ else:
         with st.container():
             st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
             st.subheader("Control Panel")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Get unique NIC descriptions from the data
-                nic_descriptions = df['NIC Description'].unique()
-                num_sectors = st.slider(
-                    "Number of top sectors to display", 
-                    min_value=5, 
-                    max_value=min(15, len(nic_descriptions)), 
-                    value=min(10, len(nic_descriptions))
-                )
             
-            with col2:
-                chart_type = st.selectbox(
-                    "Select chart type", 
-                    ["Bar Chart", "Pie Chart", "Treemap"]
-                )
+            # Get unique NIC descriptions from the data
+            nic_descriptions = df['NIC Description'].unique()
+            num_sectors = st.slider(
+                "Number of top sectors to display", 
+                min_value=5, 
+                max_value=min(15, len(nic_descriptions)), 
+                value=min(10, len(nic_descriptions))
+            )
             st.markdown("</div>", unsafe_allow_html=True)
         
         # Main content area with better organization
         col1, col2 = st.columns([2, 1])
         
-        # Filter for manufacturing sectors only
-        manufacturing_df = df[df['NIC Description'].str.contains('Manufactur', case=False, na=False)]
-        
-        # If no manufacturing sectors are found, use all data
-        if manufacturing_df.empty:
-            manufacturing_df = df
-            st.info("No specific 'Manufacture' entries found, displaying all sectors.")
-        
-        # Prepare data - group by NIC Description and sum values
+        # Prepare data - group the year-range series totals by NIC Description
         try:
-            # Ensure 'Value' column exists and is numeric
-            if 'Value' in manufacturing_df.columns:
-                manufacturing_df['Value'] = pd.to_numeric(manufacturing_df['Value'], errors='coerce')
-                top_factories = manufacturing_df.groupby('NIC Description')['Value'].sum().nlargest(num_sectors)
+            if series_totals is not None:
+                # Filter for manufacturing sectors only
+                manufacturing_df = series_totals[series_totals['NIC Description'].str.contains('Manufactur', case=False, na=False)]
+
+                # If no manufacturing sectors are found, use all data
+                if manufacturing_df.empty:
+                    manufacturing_df = series_totals
+                    st.info("No specific 'Manufacture' entries found, displaying all sectors.")
+
+                top_factories = manufacturing_df.groupby('NIC Description')[value_col].sum().nlargest(num_sectors)
             else:
-                # Try to find a value column based on columns containing "value" or similar
-                value_cols = [col for col in manufacturing_df.columns if 'value' in col.lower() or 'count' in col.lower() or 'number' in col.lower()]
-                if value_cols:
-                    value_col = value_cols[0]
-                    manufacturing_df[value_col] = pd.to_numeric(manufacturing_df[value_col], errors='coerce')
-                    top_factories = manufacturing_df.groupby('NIC Description')[value_col].sum().nlargest(num_sectors)
-                else:
-                    st.error("Could not identify a value column in the data.")
-                    top_factories = pd.Series()
+                st.error("Could not identify a value column in the data.")
+                top_factories = pd.Series()
         except Exception as e:
             st.error(f"Error processing sector data: {e}")
             top_factories = pd.Series()
@@ -262,69 +626,7 @@ else:
             # Visualization based on selected chart type with improved styling
             with col1:
                 st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-                if chart_type == "Bar Chart":
-                    st.markdown(f"<h3 style='color: #1e3a8a;'>Top {num_sectors} Manufacturing Sectors by Number of Factories</h3>", unsafe_allow_html=True)
-                    fig = px.bar(
-                        plot_df,
-                        x='Sector',
-                        y='Factories',
-                        color='Factories',
-                        color_continuous_scale='viridis',
-                        text_auto='.2s',
-                        height=600
-                    )
-                    fig.update_layout(
-                        xaxis_title="Manufacturing Sector",
-                        yaxis_title="Number of Factories",
-                        font=dict(size=12),
-                        xaxis={'categoryorder':'total descending'},
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        margin=dict(t=30, b=100, l=80, r=40)
-                    )
-                    fig.update_xaxes(tickangle=45)
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                elif chart_type == "Pie Chart":
-                    st.markdown(f"<h3 style='color: #1e3a8a;'>Distribution of Top {num_sectors} Manufacturing Sectors</h3>", unsafe_allow_html=True)
-                    fig = px.pie(
-                        plot_df,
-                        values='Factories',
-                        names='Sector',
-                        color_discrete_sequence=px.colors.sequential.Viridis,
-                        height=600
-                    )
-                    fig.update_traces(
-                        textposition='inside',
-                        textinfo='percent+label',
-                        hole=0.4,
-                        pull=[0.05 if i == 0 else 0 for i in range(len(plot_df))]
-                    )
-                    fig.update_layout(
-                        font=dict(size=12),
-                        legend_title_text='Sectors',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        margin=dict(t=30, b=50, l=40, r=40)
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                elif chart_type == "Treemap":
-                    st.markdown(f"<h3 style='color: #1e3a8a;'>Treemap of Top {num_sectors} Manufacturing Sectors</h3>", unsafe_allow_html=True)
-                    fig = px.treemap(
-                        plot_df,
-                        path=['Sector'],
-                        values='Factories',
-                        color='Factories',
-                        color_continuous_scale='viridis',
-                        height=600
-                    )
-                    fig.update_layout(
-                        font=dict(size=14),
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        margin=dict(t=30, b=30, l=30, r=30)
-                    )
-                    # Fix the textinfo parameter - use a valid value
-                    fig.update_traces(textinfo="label+value")
-                    st.plotly_chart(fig, use_container_width=True)
+                sector_chart_panel(plot_df, num_sectors)
                 st.markdown("</div>", unsafe_allow_html=True)
             
             # Statistics and insights with improved styling
@@ -348,29 +650,7 @@ else:
                 st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
                 st.markdown("<h3 style='color: #1e3a8a;'>Sector Comparison</h3>", unsafe_allow_html=True)
                 
-                selected_sectors = st.multiselect(
-                    "Select sectors to compare",
-                    options=plot_df['Sector'].tolist(),
-                    default=plot_df['Sector'].tolist()[:min(3, len(plot_df))]
-                )
-                
-                if selected_sectors:
-                    comparison_df = plot_df[plot_df['Sector'].isin(selected_sectors)]
-                    fig = px.bar(
-                        comparison_df,
-                        x='Sector',
-                        y='Factories',
-                        color='Sector',
-                        height=300
-                    )
-                    fig.update_layout(
-                        showlegend=False,
-                        xaxis_title="",
-                        yaxis_title="Factories",
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        margin=dict(t=20, b=30, l=60, r=20)
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                sector_comparison_panel(plot_df)
                 st.markdown("</div>", unsafe_allow_html=True)
         else:
             st.warning("No sector data available for analysis. Please check your data format.")
@@ -404,26 +684,17 @@ else:
             )
         st.markdown("</div>", unsafe_allow_html=True)
         
-        if selected_sector:
-            # Filter data based on selection
-            sector_df = df[df['NIC Description'] == selected_sector].copy()
-            
+        if 'State' not in df.columns:
+            st.error("No 'State' column found in the data for regional distribution analysis.")
+        elif selected_sector:
+            # Filter data based on selection, using the year-range series totals when available
+            if series_totals is not None:
+                sector_df = series_totals[series_totals['NIC Description'] == selected_sector]
+            else:
+                sector_df = df[df['NIC Description'] == selected_sector]
+
             if not sector_df.empty:
-                # Ensure 'Value' column is numeric
-                value_col = 'Value'
-                if value_col in sector_df.columns:
-                    sector_df[value_col] = pd.to_numeric(sector_df[value_col], errors='coerce')
-                else:
-                    # Try to identify a value column
-                    value_cols = [col for col in sector_df.columns if 'value' in col.lower() or 'count' in col.lower() or 'number' in col.lower()]
-                    if value_cols:
-                        value_col = value_cols[0]
-                        sector_df[value_col] = pd.to_numeric(sector_df[value_col], errors='coerce')
-                    else:
-                        st.error("Could not identify a value column for regional distribution.")
-                        value_col = None
-                
-                if value_col:
+                if series_totals is not None:
                     # Group by state and sum values
                     state_totals = sector_df.groupby('State')[value_col].sum().reset_index()
                     
@@ -491,22 +762,7 @@ else:
                         st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
                         st.markdown("<h3 style='color: #1e3a8a;'>State Comparison</h3>", unsafe_allow_html=True)
                         
-                        selected_states = st.multiselect(
-                            "Select states to compare",
-                            options=state_totals['State'].tolist(),
-                            default=state_totals.nlargest(min(3, len(state_totals)), map_column)['State'].tolist()
-                        )
-                        
-                        if selected_states:
-                            comparison_df = state_totals[state_totals['State'].isin(selected_states)]
-                            fig = px.pie(
-                                comparison_df,
-                                values=map_column,
-                                names='State',
-                                height=300
-                            )
-                            fig.update_traces(textposition='inside', textinfo='percent+label')
-                            st.plotly_chart(fig, use_container_width=True)
+                        state_comparison_panel(state_totals, map_column)
                         st.markdown("</div>", unsafe_allow_html=True)
                 else:
                     st.error("No valid value column found for regional analysis.")
@@ -519,19 +775,21 @@ else:
     with tab3:
         st.markdown("<h2 style='color: #1e3a8a; font-weight: 700;'>Time Series Analysis</h2>", unsafe_allow_html=True)
         
-        # Check if 'Year' column exists
-        if 'Year' in time_df.columns:
-            # Convert Year to numeric to ensure sorting works correctly
-            time_df['Year'] = pd.to_numeric(time_df['Year'], errors='coerce')
-            
-            # Get unique years and sort them
-            years = sorted(time_df['Year'].unique().tolist())
+        # Check if 'Year' and 'State' columns exist
+        if 'State' not in time_df.columns:
+            st.warning("No 'State' column found in the data for time series analysis.")
+        elif 'Year' in time_df.columns:
+            # Get the years inside the selected range
+            if year_prefix is not None:
+                years = year_range_years(year_prefix, year_range)
+            else:
+                years = sorted(time_df['Year'].unique().tolist())
             
             if len(years) > 1:
                 # Control panel with improved organization
                 st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
                 st.subheader("Control Panel")
-                col1, col2, col3 = st.columns(3)
+                col1, col2 = st.columns(2)
                 
                 with col1:
                     states = sorted(time_df['State'].unique().tolist())
@@ -547,40 +805,26 @@ else:
                         options=['All Sectors'] + sectors,
                         key="time_sector"
                     )
-                
-                with col3:
-                    trend_type = st.selectbox(
-                        "Trend visualization",
-                        options=["Line chart", "Area chart", "Bar chart"]
-                    )
+
                 st.markdown("</div>", unsafe_allow_html=True)
                 
-                # Determine value column
-                value_col = 'Value'
-                if value_col not in time_df.columns:
-                    value_cols = [col for col in time_df.columns if 'value' in col.lower() or 'count' in col.lower() or 'number' in col.lower()]
-                    if value_cols:
-                        value_col = value_cols[0]
-                    else:
-                        st.error("Could not identify a value column for time series analysis.")
-                        value_col = None
-                
                 if value_col:
-                    # Ensure value column is numeric
-                    time_df[value_col] = pd.to_numeric(time_df[value_col], errors='coerce')
+                    # Select the series matching the filters
+                    series = year_prefix['series']
+                    series_mask = np.ones(len(series), dtype=bool)
+                    if selected_state != 'All States':
+                        series_mask &= (series['State'] == selected_state).to_numpy()
+                    if selected_time_sector != 'All Sectors':
+                        series_mask &= (series['NIC Description'] == selected_time_sector).to_numpy()
+                    filtered_time_df = year_range_values(year_prefix, year_range, series_mask).groupby('Year')[value_col].sum().reset_index()
                     
-                    # Filter data based on selection
                     if selected_state == 'All States' and selected_time_sector == 'All Sectors':
-                        filtered_time_df = time_df.groupby('Year')[value_col].sum().reset_index()
                         chart_title = "Overall Growth in Manufacturing (All Sectors, All States)"
                     elif selected_state == 'All States':
-                        filtered_time_df = time_df[time_df['NIC Description'] == selected_time_sector].groupby('Year')[value_col].sum().reset_index()
                         chart_title = f"Growth in {selected_time_sector.replace('Manufacture of', '')} (All States)"
                     elif selected_time_sector == 'All Sectors':
-                        filtered_time_df = time_df[time_df['State'] == selected_state].groupby('Year')[value_col].sum().reset_index()
                         chart_title = f"Overall Manufacturing Growth in {selected_state} (All Sectors)"
                     else:
-                        filtered_time_df = time_df[(time_df['State'] == selected_state) & (time_df['NIC Description'] == selected_time_sector)].groupby('Year')[value_col].sum().reset_index()
                         chart_title = f"Growth in {selected_time_sector.replace('Manufacture of', '')} in {selected_state}"
                     
                     # Ensure data is sorted by year
@@ -610,42 +854,7 @@ else:
                         col3.metric("CAGR", f"{cagr:.2f}%")
                         
                         # Create time series visualization
-                        if trend_type == "Line chart":
-                            fig = px.line(
-                                filtered_time_df,
-                                x='Year',
-                                y=value_col,
-                                markers=True,
-                                title=chart_title,
-                                height=500
-                            )
-                            fig.update_traces(line=dict(width=3))
-                        elif trend_type == "Area chart":
-                            fig = px.area(
-                                filtered_time_df,
-                                x='Year',
-                                y=value_col,
-                                title=chart_title,
-                                height=500
-                            )
-                        else:  # Bar chart
-                            fig = px.bar(
-                                filtered_time_df,
-                                x='Year',
-                                y=value_col,
-                                title=chart_title,
-                                height=500,
-                                text_auto='.2s'
-                            )
-                        
-                        fig.update_layout(
-                            xaxis_title="Year",
-                            yaxis_title="Number of Factories",
-                            plot_bgcolor='rgba(0,0,0,0)',
-                            margin=dict(t=50, b=50, l=60, r=40)
-                        )
-                        fig.update_xaxes(dtick=1)  # Show all years
-                        st.plotly_chart(fig, use_container_width=True)
+                        trend_chart_panel(filtered_time_df, value_col, chart_title)
                         
                         # Year-over-Year comparison
                         st.markdown("<h3 style='color: #1e3a8a;'>Year-over-Year Growth</h3>", unsafe_allow_html=True)
@@ -691,18 +900,19 @@ else:
                         st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
                         st.markdown("<h3 style='color: #1e3a8a;'>State Comparison Over Time</h3>", unsafe_allow_html=True)
                         
-                        # Get top 5 states by most recent year value
-                        top_states = time_df[time_df['NIC Description'] == selected_time_sector].groupby('State')[value_col].sum().nlargest(5).index.tolist()
+                        # Get top 5 states by total over the selected years
+                        top_states = series_totals[series_totals['NIC Description'] == selected_time_sector].groupby('State')[value_col].sum().nlargest(5).index.tolist()
                         
                         # Ensure the selected state is included
                         if selected_state not in top_states:
                             top_states[-1] = selected_state
                         
                         # Filter data for these states
-                        comparison_df = time_df[
-                            (time_df['State'].isin(top_states)) & 
-                            (time_df['NIC Description'] == selected_time_sector)
-                        ].groupby(['Year', 'State'])[value_col].sum().reset_index()
+                        comparison_mask = (
+                            (series['State'].isin(top_states)) & 
+                            (series['NIC Description'] == selected_time_sector)
+                        ).to_numpy()
+                        comparison_df = year_range_values(year_prefix, year_range, comparison_mask).groupby(['Year', 'State'])[value_col].sum().reset_index()
                         
                         # Create line chart comparing states
                         fig = px.line(
@@ -732,8 +942,12 @@ else:
         else:
             st.warning("No 'Year' column found in the data for time series analysis.")
 
-    # Tab 4: About
+    # Tab 4: Data Quality
     with tab4:
+        show_validation_report(validation_report)
+
+    # Tab 5: About
+    with tab5:
         st.markdown("<h2 style='color: #1e3a8a; font-weight: 700;'>About this Dashboard</h2>", unsafe_allow_html=True)
         
         st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
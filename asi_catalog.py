@@ -0,0 +1,68 @@
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from asi_ingest import KNOWN_STATES, normalise_state_name
+
+# Known state names by their normalised form, so "Tamil_Nadu" or "tamil-nadu" match "Tamil Nadu"
+STATE_LOOKUP = dict(zip(normalise_state_name(pd.Series(KNOWN_STATES)), KNOWN_STATES))
+STATE_LOOKUP = {key: state for key, state in STATE_LOOKUP.items() if state != "Other"}
+
+
+# Function to find the year in a path segment such as 2015, ASI_2015 or 2015-Kerala
+def find_year(segment):
+    year_match = re.search(r'(?<!\d)(?:19|20)\d{2}(?!\d)', segment)
+    return int(year_match.group(0)) if year_match else None
+
+
+# Function to find a known state in a path segment such as Kerala, ASI_2015_Tamil_Nadu
+# or Jammu & Kashmir, preferring the longest match ("NCT of Delhi" over "Delhi")
+def find_state(segment):
+    tokens = [token for token in re.split(r'[_\-\s]+', segment) if token]
+    candidates = [
+        ' '.join(tokens[start:start + length])
+        for length in range(len(tokens), 0, -1)
+        for start in range(len(tokens) - length + 1)
+    ]
+    for name in normalise_state_name(pd.Series(candidates, dtype=object)):
+        if name in STATE_LOOKUP:
+            return STATE_LOOKUP[name]
+    return None
+
+
+# Function to index a directory of partitioned workbooks into a manifest.
+# Partition keys come from the path. Hive-style segments such as state=Kerala/year=2015.xlsx
+# are used first, with underscores read as spaces (state=Tamil_Nadu). Otherwise the year and
+# state are read from plain directory and file names, e.g. 2015/Kerala.xlsx or ASI_Kerala_2015.xlsx,
+# with the innermost segment winning. Files with no key for a dimension hold every year or state
+def build_catalog_manifest(data_dir):
+    rows = []
+    for path in sorted(Path(data_dir).rglob('*')):
+        if path.suffix.lower() not in ('.xlsx', '.xls') or path.name.startswith('~$'):
+            continue
+
+        keys = {}
+        plain_segments = []
+        for segment in path.relative_to(data_dir).with_suffix('').parts:
+            key, sep, value = segment.partition('=')
+            if sep and key.lower() in ('year', 'state') and value:
+                keys[key.lower()] = value.replace('_', ' ').strip()
+            else:
+                plain_segments.append(segment)
+
+        year = find_year(keys['year']) if 'year' in keys else None
+        state = keys.get('state')
+        for segment in reversed(plain_segments):
+            if year is None and 'year' not in keys:
+                year = find_year(segment)
+            if state is None:
+                state = find_state(segment)
+
+        rows.append({
+            'Path': str(path),
+            'Modified': path.stat().st_mtime,
+            'Year': year,
+            'State': state
+        })
+    return pd.DataFrame(rows, columns=['Path', 'Modified', 'Year', 'State'])
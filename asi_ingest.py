@@ -0,0 +1,209 @@
+import asyncio
+import os
+import re
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+import pandas as pd
+import requests
+
+from asi_ranges import prepare_ranges
+
+# Default workbook, overridable through ASI_DATA_URL
+DEFAULT_DATA_URL = "https://github.com/waliapriyanshu/Annual-Survey-of-Industries-ASI/raw/0855da82d8f9bc0b6e24dcb2195c605db4a19fd2/ASI%20data.xlsx"
+
+# Sheets read from the default workbook; other data files are read in full
+DEFAULT_DATA_SHEETS = ('Sheet1', 'Sheet2', 'Sheet3')
+
+
+# Function to list the sources to ingest as (kind, location, sheets) tuples.
+# 'data' is the main workbook from ASI_DATA_URL and must load. 'supplementary'
+# files from ASI_SUPPLEMENTARY_SOURCES (comma-separated) and the 'nic' code
+# mapping table from ASI_NIC_MAPPING_SOURCE are optional
+def default_sources():
+    data_url = os.environ.get("ASI_DATA_URL") or DEFAULT_DATA_URL
+    sources = [('data', data_url, DEFAULT_DATA_SHEETS if data_url == DEFAULT_DATA_URL else None)]
+    for location in os.environ.get("ASI_SUPPLEMENTARY_SOURCES", "").split(','):
+        if location.strip():
+            sources.append(('supplementary', location.strip(), None))
+    if os.environ.get("ASI_NIC_MAPPING_SOURCE"):
+        sources.append(('nic', os.environ["ASI_NIC_MAPPING_SOURCE"], None))
+    return tuple(sources)
+
+
+# Function to get a readable name for a source URL or path
+def source_name(location):
+    return unquote(Path(urlparse(location).path).name) or location
+
+
+# Function to download a remote source in chunks, or read a local one, recording progress
+def download_source(location, progress):
+    if not re.match(r'https?://', location):
+        content = Path(location).read_bytes()
+        progress[location] = {'received': len(content), 'total': len(content), 'stage': 'Read'}
+        return content
+
+    with requests.get(location, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        total = int(response.headers.get('Content-Length', 0))
+        buffer = BytesIO()
+        for chunk in response.iter_content(chunk_size=1 << 16):
+            buffer.write(chunk)
+            progress[location] = {'received': buffer.tell(), 'total': total, 'stage': 'Downloading'}
+        return buffer.getvalue()
+
+
+# Function to parse downloaded CSV or Excel content into one dataframe
+def parse_source(content, location, kind, sheets):
+    # Check the URL path so query strings such as ?raw=true don't hide the extension
+    if urlparse(location).path.lower().endswith('.csv'):
+        sheet_frames = {None: pd.read_csv(BytesIO(content))}
+    else:
+        sheet_frames = pd.read_excel(BytesIO(content), sheet_name=list(sheets) if sheets else None)
+
+    sheet_dfs = []
+    for sheet, df in sheet_frames.items():
+        # Add file and sheet name as source so data-quality checks can be traced back
+        if kind != 'nic' and 'Source' not in df.columns:
+            df['Source'] = source_name(location) if sheet is None else f"{source_name(location)} / {sheet}"
+        sheet_dfs.append(df)
+    return pd.concat(sheet_dfs, ignore_index=True)
+
+
+# Function to fill NIC descriptions from a code mapping table
+def apply_nic_mapping(df, mapping):
+    code_cols = [col for col in mapping.columns if col != 'NIC Description' and col in df.columns]
+    if not code_cols or 'NIC Description' not in mapping.columns:
+        return df
+
+    lookup = mapping.drop_duplicates(code_cols[0]).set_index(code_cols[0])['NIC Description']
+    descriptions = df[code_cols[0]].map(lookup)
+    if 'NIC Description' in df.columns:
+        df['NIC Description'] = df['NIC Description'].fillna(descriptions)
+    else:
+        df['NIC Description'] = descriptions
+    return df
+
+
+# State and union territory names used by ASI, including older spellings
+KNOWN_STATES = [
+    "All India", "Andaman and Nicobar Islands", "Andaman and N Island", "Andhra Pradesh",
+    "Arunachal Pradesh", "Assam", "Bihar", "Chandigarh", "Chhattisgarh", "Chattisgarh",
+    "Dadra and Nagar Haveli", "Daman and Diu", "Dadra and Nagar Haveli and Daman and Diu",
+    "Delhi", "NCT of Delhi", "Goa", "Gujarat", "Haryana", "Himachal Pradesh",
+    "Jammu and Kashmir", "Jharkhand", "Karnataka", "Kerala", "Ladakh", "Lakshadweep",
+    "Madhya Pradesh", "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland",
+    "Odisha", "Orissa", "Puducherry", "Pondicherry", "Punjab", "Rajasthan", "Sikkim",
+    "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand", "Uttaranchal",
+    "West Bengal", "Other"
+]
+
+
+# Function to identify the column holding factory counts
+def find_value_column(frame):
+    if 'Value' in frame.columns:
+        return 'Value'
+    value_cols = [col for col in frame.columns if 'value' in col.lower() or 'count' in col.lower() or 'number' in col.lower()]
+    return value_cols[0] if value_cols else None
+
+
+# Function to normalise state names for matching, e.g. "Jammu & Kashmir" and "JAMMU AND KASHMIR"
+def normalise_state_name(names):
+    return names.astype(str).str.lower().str.replace('&', 'and', regex=False).str.replace(r'\(.*?\)|[^a-z]', '', regex=True)
+
+
+# Function to convert Year and the value column to numbers in place, once per
+# loaded dataset, and report the data-quality problems found along the way
+def coerce_and_validate(df):
+    sheets = df['Source'] if 'Source' in df.columns else pd.Series('All sheets', index=df.index)
+    keys = [col for col in ['State', 'NIC Description'] if col in df.columns]
+
+    # Cells that held something but become NaN under errors='coerce'
+    numeric_cols = [col for col in ['Year', find_value_column(df)] if col is not None and col in df.columns]
+    coerced = {}
+    for col in numeric_cols:
+        numeric = pd.to_numeric(df[col], errors='coerce')
+        coerced[col] = df[col].notna() & numeric.isna()
+        df[col] = numeric
+    coerced_counts = pd.DataFrame(coerced, index=df.index).groupby(sheets, dropna=False).sum().rename_axis('Sheet').reset_index()
+    coerced_counts = coerced_counts.melt(id_vars='Sheet', var_name='Column', value_name='Coerced values')
+    coerced_counts = coerced_counts[coerced_counts['Coerced values'] > 0].reset_index(drop=True)
+
+    # Rows sharing the same (State, NIC Description, Year) key
+    key_df = df[keys].copy()
+    key_df['Year'] = df['Year'] if 'Year' in df.columns else np.nan
+    duplicate_rows = key_df[key_df.duplicated(keep=False)]
+    duplicates = duplicate_rows.groupby(list(key_df.columns), dropna=False).size().rename('Rows').reset_index()
+
+    # State names that do not match any known state or union territory
+    unmatched_states = []
+    if 'State' in df.columns:
+        states = pd.Series(df['State'].dropna().unique())
+        known = set(normalise_state_name(pd.Series(KNOWN_STATES)))
+        unmatched_states = sorted(states[~normalise_state_name(states).isin(known)].astype(str).tolist())
+
+    # Years missing from the overall span, and series with holes in their own span
+    missing_years = []
+    series_with_gaps = 0
+    years = key_df.dropna(subset=['Year'])
+    if not years.empty:
+        present = set(years['Year'].astype(int))
+        missing_years = [year for year in range(min(present), max(present) + 1) if year not in present]
+        if keys:
+            spans = years.groupby(keys, dropna=False)['Year'].agg(['min', 'max', 'nunique'])
+            series_with_gaps = int((spans['max'] - spans['min'] + 1 > spans['nunique']).sum())
+
+    return {
+        'rows': len(df),
+        'coerced': coerced_counts,
+        'duplicates': duplicates,
+        'duplicate_rows': len(duplicate_rows),
+        'unmatched_states': unmatched_states,
+        'missing_years': missing_years,
+        'series_with_gaps': series_with_gaps
+    }
+
+
+# Function to coerce and validate a loaded dataset and precompute its range arrays,
+# so everything derived from the full frame is built once at load time
+def prepare_dataset(df):
+    report = coerce_and_validate(df)
+    return {'report': report, **prepare_ranges(df, find_value_column(df))}
+
+
+# Fetch one source and parse it as soon as its own download finishes,
+# so parsing overlaps with the other sources still downloading
+async def ingest_source(kind, location, sheets, progress):
+    try:
+        content = await asyncio.to_thread(download_source, location, progress)
+        progress[location] = {**progress[location], 'stage': 'Parsing'}
+        df = await asyncio.to_thread(parse_source, content, location, kind, sheets)
+    except Exception as e:
+        progress[location] = {**progress.get(location, {'received': 0, 'total': 0}), 'stage': 'Failed', 'error': str(e)}
+        raise
+    progress[location] = {**progress[location], 'stage': 'Done'}
+    return kind, df
+
+
+# Fetch all sources concurrently, combine the data with any reference tables and
+# prepare the result. Optional sources that fail are left out and keep their error in progress
+async def ingest_sources(sources, progress):
+    for _, location, _ in sources:
+        progress.setdefault(location, {'received': 0, 'total': 0, 'stage': 'Waiting'})
+
+    results = await asyncio.gather(
+        *(ingest_source(kind, location, sheets, progress) for kind, location, sheets in sources),
+        return_exceptions=True
+    )
+    for (kind, _, _), result in zip(sources, results):
+        if kind == 'data' and isinstance(result, BaseException):
+            raise result
+
+    loaded = [result for result in results if not isinstance(result, BaseException)]
+    combined_df = pd.concat([df for kind, df in loaded if kind != 'nic'], ignore_index=True)
+    for kind, df in loaded:
+        if kind == 'nic':
+            combined_df = apply_nic_mapping(combined_df, df)
+    return combined_df, prepare_dataset(combined_df)
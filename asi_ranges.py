@@ -0,0 +1,106 @@
+import numpy as np
+
+
+# Function to get the series key columns present in the data
+def series_key_columns(frame):
+    return [col for col in ['State', 'NIC Description'] if col in frame.columns]
+
+
+# Function to precompute cumulative sums over Year for each (State, NIC Description) series.
+# Year and the value column must already be numeric (see asi_ingest.coerce_and_validate)
+def build_year_prefix_sums(df, value_col):
+    keys = series_key_columns(df)
+    if value_col is None or 'Year' not in df.columns or not keys:
+        return None
+
+    frame = df[keys + ['Year', value_col]]
+    dated = frame.dropna(subset=['Year'])
+    if dated.empty:
+        return None
+
+    # One row per series and one column per year
+    grouped = dated.groupby(keys + ['Year'], dropna=False)[value_col]
+    values = grouped.sum().unstack('Year', fill_value=0)
+    counts = grouped.size().unstack('Year', fill_value=0).reindex(index=values.index, columns=values.columns, fill_value=0)
+
+    # Rows without a usable Year still count towards totals over the full range
+    undated = frame[frame['Year'].isna()]
+    series_index = values.index.union(undated.groupby(keys, dropna=False).size().index) if not undated.empty else values.index
+    values = values.reindex(series_index, fill_value=0)
+    counts = counts.reindex(series_index, fill_value=0)
+    undated_values = undated.groupby(keys, dropna=False)[value_col].sum().reindex(series_index, fill_value=0)
+
+    # Leading zero column so the total over columns [lo, hi) is cumsum[:, hi] - cumsum[:, lo]
+    zeros = np.zeros((len(values), 1))
+    return {
+        'series': series_index.to_frame(index=False),
+        'years': values.columns.to_numpy(),
+        'value_col': value_col,
+        'values': np.hstack([zeros, values.to_numpy(dtype=float).cumsum(axis=1)]),
+        'counts': np.hstack([zeros, counts.to_numpy(dtype=float).cumsum(axis=1)]),
+        'undated': undated_values.to_numpy(dtype=float),
+        'undated_rows': len(undated)
+    }
+
+
+# Function to total each (State, NIC Description) series when there is no Year column
+def build_series_totals(df, value_col):
+    if value_col is None or not series_key_columns(df):
+        return None
+    return df[value_col].groupby([df[col] for col in series_key_columns(df)], dropna=False).sum().reset_index()
+
+
+# Function to map a year range onto column positions of the prefix-sum arrays
+def year_range_bounds(year_prefix, year_range):
+    years = year_prefix['years']
+    lo = np.searchsorted(years, year_range[0], side='left')
+    hi = np.searchsorted(years, year_range[1], side='right')
+    return lo, hi
+
+
+# Function to check whether a year range covers every year in the prefix-sum arrays
+def is_full_year_range(year_prefix, year_range):
+    lo, hi = year_range_bounds(year_prefix, year_range)
+    return lo == 0 and hi == len(year_prefix['years'])
+
+
+# Function to get the years with data inside a year range
+def year_range_years(year_prefix, year_range):
+    lo, hi = year_range_bounds(year_prefix, year_range)
+    return year_prefix['years'][lo:hi].tolist()
+
+
+# Function to total every series over a year range with one lookup per series
+def year_range_totals(year_prefix, year_range):
+    lo, hi = year_range_bounds(year_prefix, year_range)
+    totals = year_prefix['series'].copy()
+    totals[year_prefix['value_col']] = year_prefix['values'][:, hi] - year_prefix['values'][:, lo]
+
+    # Rows without a usable Year only belong to the full range
+    if is_full_year_range(year_prefix, year_range):
+        totals[year_prefix['value_col']] += year_prefix['undated']
+    return totals
+
+
+# Function to get yearly values inside a year range for the series selected by mask
+def year_range_values(year_prefix, year_range, mask):
+    lo, hi = year_range_bounds(year_prefix, year_range)
+    values = np.diff(year_prefix['values'][mask, lo:hi + 1], axis=1)
+    counts = np.diff(year_prefix['counts'][mask, lo:hi + 1], axis=1)
+
+    # Keep only the (series, year) cells that had rows in the source data
+    rows, cols = np.nonzero(counts)
+    result = year_prefix['series'][mask].iloc[rows].reset_index(drop=True)
+    result['Year'] = year_prefix['years'][lo:hi][cols]
+    result[year_prefix['value_col']] = values[rows, cols]
+    return result
+
+
+# Function to build everything the views need from a loaded dataset in one pass
+def prepare_ranges(df, value_col):
+    year_prefix = build_year_prefix_sums(df, value_col)
+    return {
+        'value_col': value_col,
+        'year_prefix': year_prefix,
+        'series_totals': build_series_totals(df, value_col) if year_prefix is None else None
+    }
@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from asi_catalog import build_catalog_manifest, find_state
+
+
+def write_catalog(root, paths):
+    for path in paths:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_bytes(b"")
+
+
+def manifest_keys(root):
+    manifest = build_catalog_manifest(root)
+    return {
+        Path(row.Path).relative_to(root).as_posix(): (row.Year, row.State)
+        for row in manifest.astype(object).where(manifest.notna(), None).itertuples()
+    }
+
+
+def test_manifest_reads_hive_style_keys(tmp_path):
+    write_catalog(tmp_path, ['state=Tamil_Nadu/year=2015.xlsx', 'year=2016/state=Kerala.xlsx'])
+
+    assert manifest_keys(tmp_path) == {
+        'state=Tamil_Nadu/year=2015.xlsx': (2015, 'Tamil Nadu'),
+        'year=2016/state=Kerala.xlsx': (2016, 'Kerala'),
+    }
+
+
+def test_manifest_reads_bare_directory_and_file_names(tmp_path):
+    write_catalog(tmp_path, [
+        'Kerala.xlsx',
+        '2014/Kerala.xlsx',
+        'Haryana/ASI_2016.xlsx',
+        'ASI_2017_Tamil-Nadu.xls',
+        'all_states_2018.xlsx',
+    ])
+
+    assert manifest_keys(tmp_path) == {
+        'Kerala.xlsx': (None, 'Kerala'),
+        '2014/Kerala.xlsx': (2014, 'Kerala'),
+        'Haryana/ASI_2016.xlsx': (2016, 'Haryana'),
+        'ASI_2017_Tamil-Nadu.xls': (2017, 'Tamil Nadu'),
+        'all_states_2018.xlsx': (2018, None),
+    }
+
+
+def test_manifest_skips_other_files(tmp_path):
+    write_catalog(tmp_path, ['notes.txt', '~$Kerala.xlsx', 'Kerala.xlsx'])
+
+    assert list(manifest_keys(tmp_path)) == ['Kerala.xlsx']
+
+
+def test_find_state_prefers_the_longest_match():
+    assert find_state('NCT_of_Delhi_2015') == 'NCT of Delhi'
+    assert find_state('Jammu_&_Kashmir') == 'Jammu and Kashmir'
+    assert find_state('Other') is None
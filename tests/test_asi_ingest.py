@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import http.server
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from asi_ingest import DEFAULT_DATA_URL, coerce_and_validate, default_sources, ingest_sources, parse_source
+
+
+@pytest.fixture
+def stub_server(tmp_path):
+    pd.DataFrame({
+        'NIC': [10, 11],
+        'NIC Description': [None, 'Manufacture of textiles'],
+        'State': ['Kerala', 'Haryana'],
+        'Year': [2015, 2016],
+        'Value': [120, 80]
+    }).to_csv(tmp_path / 'main data.csv', index=False)
+    pd.DataFrame({
+        'NIC': [10],
+        'State': ['Punjab'],
+        'Year': [2016],
+        'Value': [40]
+    }).to_csv(tmp_path / 'extra.csv', index=False)
+    pd.DataFrame({
+        'NIC': [10, 11],
+        'NIC Description': ['Manufacture of food products', 'Manufacture of textiles']
+    }).to_csv(tmp_path / 'nic.csv', index=False)
+
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(tmp_path))
+    handler.log_message = lambda *args: None
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+
+
+def test_ingest_combines_sources_from_local_server(stub_server):
+    sources = (
+        ('data', stub_server + 'main%20data.csv?raw=true', None),
+        ('supplementary', stub_server + 'extra.csv', None),
+        ('nic', stub_server + 'nic.csv', None),
+    )
+    progress = {}
+    combined_df, prepared = asyncio.run(ingest_sources(sources, progress))
+
+    assert len(combined_df) == 3
+    assert prepared['report']['rows'] == 3
+    assert prepared['value_col'] == 'Value'
+    assert prepared['year_prefix']['years'].tolist() == [2015, 2016]
+    assert combined_df['Value'].sum() == 240
+    assert combined_df['NIC Description'].isna().sum() == 0
+    assert set(combined_df['Source']) == {'main data.csv', 'extra.csv'}
+    assert all(state['stage'] == 'Done' for state in progress.values())
+
+
+def test_optional_source_failure_is_reported(stub_server):
+    missing = stub_server + 'missing.csv'
+    sources = (
+        ('data', stub_server + 'main%20data.csv', None),
+        ('supplementary', missing, None),
+    )
+    progress = {}
+    combined_df, _ = asyncio.run(ingest_sources(sources, progress))
+
+    assert len(combined_df) == 2
+    assert progress[missing]['stage'] == 'Failed'
+    assert '404' in progress[missing]['error']
+
+
+def test_main_source_failure_raises(stub_server):
+    sources = (('data', stub_server + 'missing.csv', None),)
+    with pytest.raises(requests.HTTPError) as excinfo:
+        asyncio.run(ingest_sources(sources, {}))
+    assert '404' in str(excinfo.value)
+
+
+def test_parse_source_detects_csv_behind_query_string():
+    df = parse_source(b"State,Value\nKerala,1\n", "https://example.com/data.csv?raw=true", 'data', None)
+    assert df['Source'].tolist() == ['data.csv']
+
+
+def test_default_sources_read_environment(monkeypatch):
+    monkeypatch.delenv("ASI_DATA_URL", raising=False)
+    monkeypatch.delenv("ASI_SUPPLEMENTARY_SOURCES", raising=False)
+    monkeypatch.delenv("ASI_NIC_MAPPING_SOURCE", raising=False)
+    assert default_sources()[0][1] == DEFAULT_DATA_URL
+
+    monkeypatch.setenv("ASI_DATA_URL", "http://127.0.0.1:8000/asi.xlsx")
+    monkeypatch.setenv("ASI_SUPPLEMENTARY_SOURCES", "kerala.xlsx, haryana.xlsx")
+    monkeypatch.setenv("ASI_NIC_MAPPING_SOURCE", "nic.csv")
+    assert default_sources() == (
+        ('data', "http://127.0.0.1:8000/asi.xlsx", None),
+        ('supplementary', 'kerala.xlsx', None),
+        ('supplementary', 'haryana.xlsx', None),
+        ('nic', 'nic.csv', None),
+    )
+
+
+def test_coerce_and_validate_reports_problems():
+    df = pd.DataFrame({
+        'State': ['Kerala', 'Kerala', 'Narnia', 'Jammu & Kashmir', 'Kerala'],
+        'NIC Description': ['Food', 'Food', 'Food', 'Food', 'Food'],
+        'Year': [2015, 2015, 'n/a', 2018, 2018],
+        'Value': ['10', '5', '3', 'x', None],
+        'Source': ['Sheet1', 'Sheet1', 'Sheet2', 'Sheet2', 'Sheet2']
+    })
+    report = coerce_and_validate(df)
+
+    assert df['Year'].isna().sum() == 1
+    assert df['Value'].sum() == 18
+    assert report['coerced'].to_dict('records') == [
+        {'Sheet': 'Sheet2', 'Column': 'Year', 'Coerced values': 1},
+        {'Sheet': 'Sheet2', 'Column': 'Value', 'Coerced values': 1},
+    ]
+    assert report['duplicate_rows'] == 2
+    assert report['unmatched_states'] == ['Narnia']
+    assert report['missing_years'] == [2016, 2017]
+    assert report['series_with_gaps'] == 1
@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from asi_ranges import (
+    build_year_prefix_sums,
+    is_full_year_range,
+    prepare_ranges,
+    year_range_totals,
+    year_range_values,
+    year_range_years,
+)
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'State': ['Kerala', 'Kerala', 'Kerala', 'Haryana', 'Haryana', None],
+        'NIC Description': ['Food', 'Food', 'Food', 'Food', 'Textiles', 'Food'],
+        'Year': [2015, 2016, np.nan, 2018, 2016, 2016],
+        'Value': [10.0, 20.0, 5.0, 7.0, 3.0, 4.0]
+    })
+
+
+def totals_by_series(totals):
+    return {(state, nic): value for state, nic, value in totals.itertuples(index=False)}
+
+
+def test_full_range_totals_include_undated_rows():
+    year_prefix = build_year_prefix_sums(sample_frame(), 'Value')
+    year_range = (2015, 2018)
+
+    assert year_prefix['undated_rows'] == 1
+    assert is_full_year_range(year_prefix, year_range)
+    totals = totals_by_series(year_range_totals(year_prefix, year_range))
+    assert totals[('Kerala', 'Food')] == 35
+    assert totals[('Haryana', 'Food')] == 7
+    assert sum(totals.values()) == 49
+
+
+def test_narrowed_range_totals_leave_out_other_years():
+    year_prefix = build_year_prefix_sums(sample_frame(), 'Value')
+    year_range = (2016, 2016)
+
+    assert not is_full_year_range(year_prefix, year_range)
+    assert year_range_years(year_prefix, year_range) == [2016]
+    totals = totals_by_series(year_range_totals(year_prefix, year_range))
+    assert totals[('Kerala', 'Food')] == 20
+    assert totals[('Haryana', 'Food')] == 0
+    assert totals[('Haryana', 'Textiles')] == 3
+
+
+def test_range_without_data_years_is_empty():
+    year_prefix = build_year_prefix_sums(sample_frame(), 'Value')
+    year_range = (2017, 2017)
+
+    assert year_range_years(year_prefix, year_range) == []
+    assert year_range_totals(year_prefix, year_range)['Value'].sum() == 0
+    mask = np.ones(len(year_prefix['series']), dtype=bool)
+    assert year_range_values(year_prefix, year_range, mask).empty
+
+
+def test_yearly_values_keep_series_with_missing_keys():
+    year_prefix = build_year_prefix_sums(sample_frame(), 'Value')
+    series = year_prefix['series']
+    mask = (series['NIC Description'] == 'Food').to_numpy()
+
+    values = year_range_values(year_prefix, (2015, 2018), mask)
+    cells = {(state, year): value for state, _, year, value in values.itertuples(index=False) if pd.notna(state)}
+    assert cells == {('Kerala', 2015): 10, ('Kerala', 2016): 20, ('Haryana', 2018): 7}
+    missing_state = values[values['State'].isna()]
+    assert missing_state[['Year', 'Value']].values.tolist() == [[2016, 4]]
+
+
+def test_prepare_ranges_falls_back_to_series_totals_without_year():
+    prepared = prepare_ranges(sample_frame().drop(columns='Year'), 'Value')
+
+    assert prepared['year_prefix'] is None
+    assert prepared['series_totals']['Value'].sum() == 49